@@ -3,11 +3,14 @@ import sys
 import streamlit as st
 from pydub import AudioSegment
 import numpy as np
+import soundfile as sf
 import io
-import plotly.graph_objects as go
 import time
 import tempfile
 import subprocess
+import shutil
+import math
+from fractions import Fraction
 
 # ================== PYTHON VERSION ENFORCEMENT ================== #
 def verify_python_version():
@@ -33,24 +36,30 @@ verify_python_version()
 FFMPEG_PATH = "/usr/bin/ffmpeg"
 FFPROBE_PATH = "/usr/bin/ffprobe"
 
-# Configure environment
-os.environ["PATH"] += os.pathsep + os.path.dirname(FFMPEG_PATH)
-os.environ["FFMPEG_PATH"] = FFMPEG_PATH
-os.environ["FFPROBE_PATH"] = FFPROBE_PATH
-
-# Configure Pydub
-AudioSegment.converter = FFMPEG_PATH
-AudioSegment.ffprobe = FFPROBE_PATH
-
-# Verify FFmpeg installation
-try:
+@st.cache_resource
+def configure_ffmpeg():
+    """Point the environment and Pydub at FFmpeg and verify it, once per server"""
+    # Configure environment
+    os.environ["PATH"] += os.pathsep + os.path.dirname(FFMPEG_PATH)
+    os.environ["FFMPEG_PATH"] = FFMPEG_PATH
+    os.environ["FFPROBE_PATH"] = FFPROBE_PATH
+    
+    # Configure Pydub
+    AudioSegment.converter = FFMPEG_PATH
+    AudioSegment.ffprobe = FFPROBE_PATH
+    
+    # Verify FFmpeg installation
     ffmpeg_check = subprocess.run(
         [FFMPEG_PATH, "-version"], 
         capture_output=True, 
         text=True, 
         check=True
     )
-    ffmpeg_version = ffmpeg_check.stdout.split('\n')[0]
+    return ffmpeg_check.stdout.split('\n')[0]
+
+# Failures are not cached, so a broken install is re-checked on the next rerun
+try:
+    ffmpeg_version = configure_ffmpeg()
 except Exception as e:
     st.error(f"❌ FFmpeg verification failed: {str(e)}")
     st.session_state.ffmpeg_available = False
@@ -62,6 +71,7 @@ else:
 try:
     import librosa
     import librosa.effects
+    import scipy.fft
     LIBROSA_LOADED = True
 except ImportError as e:
     st.error(f"❌ Critical dependency missing: {str(e)}")
@@ -69,8 +79,167 @@ except ImportError as e:
     LIBROSA_LOADED = False
     st.stop()
 
+# ================== NUMBA IMPORT ================== #
+try:
+    from numba import njit, prange
+    NUMBA_LOADED = True
+except ImportError:
+    # Optional JIT - the NumPy phase vocoder is used instead
+    NUMBA_LOADED = False
+
+# ================== PHASE VOCODER ================== #
+if NUMBA_LOADED:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def vocoder_nb(D_real, D_imag, time_steps, out):
+        """Fused magnitude interpolation + phase accumulation, parallel over bins"""
+        n_bins, n_frames = D_real.shape
+        for b in prange(n_bins):
+            # Phase is carried as a unit phasor: adding angle(D1) - angle(D0)
+            # is a multiply by u1 * conj(u0), which needs no atan2/cos/sin.
+            # Everything is accumulated in double precision.
+            f0 = -1
+            m0 = m1 = 0.0
+            u0 = u1 = 1.0 + 0.0j
+            z = complex(float(D_real[b, 0]), float(D_imag[b, 0]))
+            acc = z / abs(z) if z != 0 else 1.0 + 0.0j
+            for t in range(time_steps.shape[0]):
+                step = time_steps[t]
+                f = int(step)
+                if f != f0:
+                    # Reuse the right-hand column when stepping to the next frame
+                    if f0 >= 0 and f == f0 + 1:
+                        m0, u0 = m1, u1
+                    else:
+                        z = complex(float(D_real[b, f]), float(D_imag[b, f]))
+                        m0 = abs(z)
+                        u0 = z / m0 if m0 > 0.0 else 1.0 + 0.0j
+                    # Frames past the end are zero (librosa pads 2 columns)
+                    if f + 1 < n_frames:
+                        z = complex(float(D_real[b, f + 1]), float(D_imag[b, f + 1]))
+                        m1 = abs(z)
+                        u1 = z / m1 if m1 > 0.0 else 1.0 + 0.0j
+                    else:
+                        m1, u1 = 0.0, 1.0 + 0.0j
+                    f0 = f
+                alpha = step - f
+                out[b, t] = ((1.0 - alpha) * m0 + alpha * m1) * acc
+                acc *= u1 * u0.conjugate()
+
+@st.cache_resource
+def get_vocoder_kernel():
+    """Compile the Numba kernel once (tiny dummy call) and reuse it across reruns"""
+    D = np.zeros((1, 4), dtype=np.complex64)
+    time_steps = np.arange(0, 4, 0.5, dtype=np.float64)
+    vocoder_nb(D.real, D.imag, time_steps, np.empty((1, len(time_steps)), dtype=D.dtype))
+    return vocoder_nb
+
+if NUMBA_LOADED:
+    get_vocoder_kernel()
+
+def fast_phase_vocoder(D, *, rate, hop_length=None, n_fft=None):
+    """Drop-in for librosa.phase_vocoder: Numba kernel, else vectorized NumPy"""
+    time_steps = np.arange(0, D.shape[-1], rate, dtype=np.float64)
+
+    if NUMBA_LOADED:
+        flat = D.reshape(-1, D.shape[-1])
+        d_stretch = np.empty((flat.shape[0], len(time_steps)), dtype=D.dtype)
+        get_vocoder_kernel()(flat.real, flat.imag, time_steps, d_stretch)
+        return d_stretch.reshape(D.shape[:-1] + (len(time_steps),))
+
+    frames = time_steps.astype(np.intp)
+    alpha = time_steps - frames
+
+    # Pad 0 columns to simplify boundary logic
+    padding = [(0, 0) for _ in D.shape]
+    padding[-1] = (0, 2)
+    D = np.pad(D, padding, mode="constant")
+
+    angle = np.angle(D)
+    magnitude = np.abs(D)
+    alpha = alpha.astype(magnitude.dtype)
+    mag = (1.0 - alpha) * magnitude[..., frames] + alpha * magnitude[..., frames + 1]
+
+    # Subtracting, wrapping and re-adding phi_advance only changes the phase by
+    # multiples of 2*pi, so output frame t is the initial phase plus the raw
+    # differences of frames 0..t-1. The sum grows with t - accumulate in float64.
+    dphase = angle[..., frames + 1] - angle[..., frames]
+    phase = np.empty(dphase.shape, dtype=np.float64)
+    phase[..., 0] = angle[..., 0]
+    np.cumsum(dphase[..., :-1], axis=-1, dtype=np.float64, out=phase[..., 1:])
+    phase[..., 1:] += angle[..., :1]
+
+    # Wrap back to [-pi, pi) so the phasor can be evaluated at D's precision.
+    # floor(x + 0.5) instead of np.round's round-half-even, all in place
+    wraps = np.multiply(phase, 1.0 / (2.0 * np.pi))
+    wraps += 0.5
+    np.floor(wraps, out=wraps)
+    wraps *= 2.0 * np.pi
+    phase -= wraps
+    phase = phase.astype(magnitude.dtype)
+    d_stretch = np.empty(phase.shape, dtype=D.dtype)
+    np.cos(phase, out=d_stretch.real)
+    np.sin(phase, out=d_stretch.imag)
+    d_stretch *= mag
+    return d_stretch
+
+# librosa.effects resolves phase_vocoder through librosa.core at call time
+# (librosa.core is lazily loaded, so patch the package attribute itself)
+librosa.core.phase_vocoder = fast_phase_vocoder
+
+# ================== FFT BACKEND ================== #
+# numpy.fft always computes in double precision; scipy.fft (pocketfft) keeps
+# float32 frames in single precision and caches FFT plans between calls
+librosa.set_fftlib(scipy.fft)
+
+# ================== TORCH IMPORT ================== #
+try:
+    import torch
+    from torch_pitch_shift import pitch_shift
+    TORCH_LOADED = True
+except ImportError:
+    # Optional accelerator - fall back to Librosa on CPU
+    TORCH_LOADED = False
+
+@st.cache_resource
+def get_torch_device():
+    """Pick CUDA when available (the torch path is only used on GPU)"""
+    return torch.device("cuda" if torch.cuda.is_available() else "cpu")
+
+# torch_pitch_shift defaults to n_fft = sr // 64 with hop n_fft // 32 and a
+# rectangular window - several GB of STFT for a few minutes of audio
+TORCH_N_FFT = 2048
+TORCH_HOP_LENGTH = 512
+
+# Largest pitch error accepted when rounding the shift to a cheap resampling ratio
+TORCH_SHIFT_CENTS = 2
+
+@st.cache_data(show_spinner=False)
+def get_torch_shift(sr, semitones):
+    """Shift ratio close to the requested semitones with a small resampling kernel"""
+    # pitch_shift resamples sr -> int(sr / ratio). For a plain float the two
+    # rates are usually near-coprime and the sinc kernel alone can take GBs;
+    # a target rate sharing a large factor with sr keeps the kernel small.
+    target = sr / 2.0 ** (semitones / 12)
+    tolerance = 2.0 ** (TORCH_SHIFT_CENTS / 1200)
+    candidates = range(math.ceil(target / tolerance), math.floor(target * tolerance) + 1)
+    new_sr = min(candidates, key=lambda n: sr * n // math.gcd(sr, n) ** 2)
+    return Fraction(sr, new_sr)
+
+# ================== RUBBER BAND CONFIGURATION ================== #
+RUBBERBAND_PATH = "/usr/bin/rubberband"
+# Optional - installed from apt.txt (rubberband-cli)
+RUBBERBAND_LOADED = os.path.exists(RUBBERBAND_PATH)
+
+# ================== NUMEXPR IMPORT ================== #
+try:
+    import numexpr as ne
+    NUMEXPR_LOADED = True
+except ImportError:
+    # Optional - plain NumPy ufuncs handle the int16 <-> float32 conversions
+    NUMEXPR_LOADED = False
+
 # Custom CSS styling with animations
-st.markdown("""
+APP_CSS = """
     <style>
     @import url('https://fonts.googleapis.com/css2?family=Inter:wght@400;600;800&display=swap');
     
@@ -151,7 +320,21 @@ st.markdown("""
         background: rgba(99, 102, 241, 0.1) !important;
     }
     </style>
-""", unsafe_allow_html=True)
+"""
+
+# Footer - fixed-position, so it can be emitted together with the CSS
+FOOTER_HTML = """
+    <div style="position: fixed; bottom: 0; left: 0; right: 0; text-align: center; padding: 1rem; color: rgba(255,255,255,0.6);">
+        Powered by Librosa AI Core | v3.1 | © 2023 Audio Labs International
+    </div>
+"""
+
+@st.cache_resource
+def inject_static_html():
+    """Emit the CSS and footer once; Streamlit replays the cached element on reruns"""
+    st.markdown(APP_CSS + FOOTER_HTML, unsafe_allow_html=True)
+
+inject_static_html()
 
 # Initialize session state
 if 'processed' not in st.session_state:
@@ -166,6 +349,8 @@ st.write(f"Python version: {sys.version}")
 if 'ffmpeg_version' in st.session_state:
     st.write(f"FFmpeg version: {st.session_state.ffmpeg_version}")
 st.write(f"Librosa version: {librosa.__version__}")
+if TORCH_LOADED:
+    st.write(f"Torch version: {torch.__version__} ({get_torch_device().type.upper()})")
 
 # Page header
 st.markdown("""
@@ -180,7 +365,7 @@ st.markdown("""
 
 # File upload section
 with st.expander("🎧 UPLOAD AUDIO", expanded=True):
-    uploaded_file = st.file_uploader(" ", type=["mp3", "wav", "ogg", "m4a"],
+    uploaded_file = st.file_uploader(" ", type=["mp3", "wav", "ogg", "flac", "m4a"],
                                    help="Drag and drop or click to upload your audio file")
 
 # Visualization placeholder
@@ -222,79 +407,138 @@ with st.container():
                     st.rerun()
 
 # Processing function
-def process_audio(input_file, semitones):
+SOUNDFILE_FORMATS = {'wav', 'ogg', 'flac'}
+# Output keeps the input sample rate; only rates above this are resampled
+# (pitch-shift cost scales with the number of samples)
+MAX_SAMPLE_RATE = 48000
+# Uploads FFmpeg has to read from disk go to tmpfs (RAM) when the host has it
+TMP_DIR = '/dev/shm' if os.path.isdir('/dev/shm') else None
+
+def get_tmp_dir(nbytes):
+    """TMP_DIR if it has room for nbytes, else None (the default temp dir)"""
+    # Docker gives containers a 64 MB /dev/shm - a long upload won't fit
+    if TMP_DIR is None:
+        return None
     try:
-        # Create temp file with proper extension
-        file_ext = input_file.name.split('.')[-1].lower()
-        if file_ext not in ['mp3', 'wav', 'ogg', 'm4a']:
-            file_ext = 'mp3'
-            
-        with tempfile.NamedTemporaryFile(suffix=f".{file_ext}", delete=False) as tmp_file:
-            tmp_file.write(input_file.getbuffer())
-            tmp_path = tmp_file.name
-        
-        # Load audio
-        audio = AudioSegment.from_file(tmp_path, format=file_ext)
-        audio = audio.set_sample_width(2).set_frame_rate(44100)
-        
-        samples = np.array(audio.get_array_of_samples(), dtype=np.float32)
-        sr = audio.frame_rate
-        channels = audio.channels
-        
-        # Visualization
-        y = samples.astype(np.float32) / 32768.0
-        if channels == 2:
-            y = y[::2]
-
-        fig = go.Figure()
-        fig.add_trace(go.Scatter(
-            y=y[::10],
-            line=dict(color='#6366f1', width=2),
-            fill='tozeroy',
-            fillcolor='rgba(99, 102, 241, 0.2)',
-            name="Waveform"
-        ))
-        fig.update_layout(
-            height=200,
-            margin=dict(l=0, r=0, t=0, b=0),
-            paper_bgcolor='rgba(0,0,0,0)',
-            plot_bgcolor='rgba(0,0,0,0)',
-            xaxis=dict(showgrid=False),
-            yaxis=dict(showgrid=False, range=[-1, 1]),
-            showlegend=False
+        free = shutil.disk_usage(TMP_DIR).free
+    except OSError:
+        return None
+    # Keep headroom for other sessions sharing the same tmpfs
+    return TMP_DIR if free > 2 * nbytes else None
+
+def to_float32(samples_i16, channels):
+    """Deinterleave int16 samples into a contiguous (channels, N) float32 array in [-1, 1)"""
+    scale = np.float32(1.0 / 32768.0)
+    # (channels, N) view of the interleaved samples, scaled into one
+    # C-ordered allocation so every channel row is contiguous
+    samples = samples_i16.reshape(-1, channels).T
+    y = np.empty(samples.shape, dtype=np.float32)
+    if NUMEXPR_LOADED:
+        # Blocked, SIMD-vectorized and multi-threaded
+        ne.evaluate('samples * scale', local_dict={'samples': samples, 'scale': scale}, out=y)
+    else:
+        np.multiply(samples, scale, out=y)
+    return y
+
+def to_int16(y):
+    """Interleave (channels, N) float audio as int16, clipping and rounding to nearest"""
+    if NUMEXPR_LOADED:
+        # Single pass: scale, clip, then add +-0.5 so the int cast rounds
+        y = ne.evaluate(
+            'where(y * scale > hi, hi, where(y * scale < lo, lo, y * scale + where(y < 0, -half, half)))',
+            local_dict={
+                'y': y,
+                'scale': np.float32(32768.0),
+                'hi': np.float32(32767.0),
+                'lo': np.float32(-32768.0),
+                'half': np.float32(0.5),
+            }
         )
-        viz_placeholder.plotly_chart(fig, use_container_width=True)
-        
-        # Processing
-        def process_channel(channel_data):
-            return librosa.effects.pitch_shift(
-                channel_data.astype(np.float32) / 32768.0,
-                sr=sr,
-                n_steps=semitones
-            ) * 32768.0
+    else:
+        y *= 32768.0
+        np.clip(y, -32768.0, 32767.0, out=y)
+        np.rint(y, out=y)
+    
+    # Cast and interleave in one pass, writing the (N, channels) buffer
+    # through its transpose
+    processed = np.empty(y.shape[::-1], dtype=np.int16)
+    np.copyto(processed.T, y, casting='unsafe')
+    return processed.reshape(-1)
+
+def rubberband_pitch_shift(y_multi, sr, semitones):
+    """Pitch-shift (channels, N) float audio with the Rubber Band CLI"""
+    tmp_paths = []
+    try:
+        # Rubber Band only works on files - keep them in tmpfs when there is
+        # room for both float32 WAVs (input and output)
+        tmp_dir = get_tmp_dir(2 * y_multi.nbytes)
+        for _ in range(2):
+            with tempfile.NamedTemporaryFile(dir=tmp_dir, suffix=".wav", delete=False) as tmp_file:
+                tmp_paths.append(tmp_file.name)
+        in_path, out_path = tmp_paths
         
-        # Handle mono/stereo
-        if channels == 1:
-            processed_samples = process_channel(samples)
-            processed = np.array(processed_samples, dtype=np.int16)
+        sf.write(in_path, y_multi.T, sr, subtype='FLOAT')
+        subprocess.run(
+            [RUBBERBAND_PATH, "--quiet", "--pitch", str(semitones), in_path, out_path],
+            capture_output=True,
+            check=True
+        )
+        shifted, _ = sf.read(out_path, dtype='float32', always_2d=True)
+        return librosa.util.fix_length(shifted.T, size=y_multi.shape[-1])
+    finally:
+        # Clean up temp files
+        for tmp_path in tmp_paths:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+def resample_int16(samples_i16, sr, channels, new_sr):
+    """Resample interleaved int16 samples through FFmpeg, returning read-only int16"""
+    # FFmpeg's resampler is band-limited; pydub's set_frame_rate (audioop.ratecv)
+    # interpolates linearly with no anti-aliasing filter
+    result = subprocess.run(
+        [FFMPEG_PATH, "-f", "s16le", "-ar", str(sr), "-ac", str(channels), "-i", "pipe:0",
+         "-f", "s16le", "-ar", str(new_sr), "pipe:1"],
+        input=memoryview(samples_i16).cast("B"), capture_output=True, check=True
+    )
+    return np.frombuffer(result.stdout, dtype=np.int16)
+
+@st.cache_resource(max_entries=1, show_spinner=False)
+def load_audio(raw_bytes, file_ext):
+    """Decode an upload to interleaved int16 samples, shared by the plot and the shift"""
+    # libsndfile decodes WAV/OGG/FLAC straight from memory to NumPy
+    if file_ext in SOUNDFILE_FORMATS:
+        try:
+            data, sr = sf.read(io.BytesIO(raw_bytes), dtype='int16', always_2d=True)
+        except RuntimeError:
+            pass
         else:
-            left = samples[0::2]
-            right = samples[1::2]
-            processed_left = process_channel(left)
-            processed_right = process_channel(right)
-            processed = np.empty(len(processed_left) + len(processed_right), dtype=np.int16)
-            processed[0::2] = processed_left.astype(np.int16)
-            processed[1::2] = processed_right.astype(np.int16)
+            # (N, channels) C-order flattens to interleaved samples
+            samples_i16 = data.reshape(-1)
+            if sr > MAX_SAMPLE_RATE:
+                samples_i16 = resample_int16(samples_i16, sr, data.shape[1], MAX_SAMPLE_RATE)
+                sr = MAX_SAMPLE_RATE
+            # The cached array is shared between reruns - keep it read-only
+            samples_i16.flags.writeable = False
+            return samples_i16, sr, data.shape[1]
+    
+    # Everything else (or anything libsndfile rejects) goes through FFmpeg
+    try:
+        # Create temp file with proper extension, in RAM-backed tmpfs when available
+        with tempfile.NamedTemporaryFile(dir=get_tmp_dir(len(raw_bytes)), suffix=f".{file_ext}", delete=False) as tmp_file:
+            tmp_file.write(raw_bytes)
+            tmp_path = tmp_file.name
         
-        return AudioSegment(
-            processed.tobytes(),
-            frame_rate=sr,
-            sample_width=2,
-            channels=channels
-        )
-    except Exception as e:
-        st.error(f"❌ Processing Error: {str(e)}")
-        return None
+        audio = AudioSegment.from_file(tmp_path, format=file_ext)
+        audio = audio.set_sample_width(2)
+        
+        # Zero-copy (read-only) int16 view of pydub's PCM bytes
+        samples_i16 = np.frombuffer(audio.raw_data, dtype=np.int16)
+        if audio.frame_rate > MAX_SAMPLE_RATE:
+            samples_i16 = resample_int16(samples_i16, audio.frame_rate, audio.channels, MAX_SAMPLE_RATE)
+            return samples_i16, MAX_SAMPLE_RATE, audio.channels
+        return samples_i16, audio.frame_rate, audio.channels
     finally:
         # Clean up temp file
         if 'tmp_path' in locals() and os.path.exists(tmp_path):
@@ -303,6 +547,82 @@ def process_audio(input_file, semitones):
             except:
                 pass
 
+def pitch_shift_samples(samples_i16, sr, channels, semitones):
+    """Pitch-shift interleaved int16 samples, returning interleaved int16"""
+    # Scale to [-1, 1) once, deinterleaved to (channels, N)
+    y_multi = to_float32(samples_i16, channels)
+    
+    # Processing - both channels are shifted in one batched call.
+    # Backends in order of speed: torch on GPU, Rubber Band (C++), then Librosa.
+    # torch on CPU is left out - Librosa with the Numba vocoder covers it.
+    if TORCH_LOADED and get_torch_device().type == "cuda":
+        device = get_torch_device()
+        x = torch.from_numpy(y_multi).to(device)
+        # Stays float32 - a float16 resampler leaves a ~70 dB noise floor
+        with torch.no_grad():
+            window = torch.hann_window(TORCH_N_FFT, device=device)
+            shifted = pitch_shift(x[None], get_torch_shift(sr, semitones), sr,
+                                  n_fft=TORCH_N_FFT, hop_length=TORCH_HOP_LENGTH, window=window)[0]
+        shifted = shifted.cpu().numpy()
+    elif RUBBERBAND_LOADED:
+        shifted = rubberband_pitch_shift(y_multi, sr, semitones)
+    else:
+        # Channels go through Librosa as one batch, so instead of a thread
+        # per channel let pocketfft spread the batched FFTs over all cores
+        with scipy.fft.set_workers(-1):
+            shifted = librosa.effects.pitch_shift(y_multi, sr=sr, n_steps=semitones)
+    
+    return to_int16(shifted)
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def shift_audio(raw_bytes, file_ext, semitones):
+    """Pitch-shift an upload and return MP3 bytes, cached per (file, semitones)"""
+    samples_i16, sr, channels = load_audio(raw_bytes, file_ext)
+    
+    if semitones == 0:
+        # Nothing to shift - skip the STFT/iSTFT round trip and its artifacts
+        processed = samples_i16
+    else:
+        processed = pitch_shift_samples(samples_i16, sr, channels, semitones)
+    
+    # Encode straight from the int16 buffer - FFmpeg reads raw PCM on stdin
+    # and writes MP3 to stdout, no AudioSegment or temp file in between
+    encode = subprocess.run(
+        [FFMPEG_PATH, "-f", "s16le", "-ar", str(sr), "-ac", str(channels), "-i", "pipe:0",
+         "-b:a", "192k", "-f", "mp3", "pipe:1"],
+        input=memoryview(processed).cast("B"),
+        capture_output=True,
+        check=True
+    )
+    return encode.stdout
+
+def envelope(y, target=2000):
+    """Min/max decimation to ~2*target points, keeping the peaks of every block"""
+    n = max(1, len(y) // target)
+    y2 = y[:n * (len(y) // n)].reshape(-1, n)
+    return np.stack([y2.min(1), y2.max(1)], axis=1).reshape(-1)
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def waveform_envelope(raw_bytes, file_ext):
+    """Envelope of an upload's left channel for the waveform plot, cached per file"""
+    samples_i16, sr, channels = load_audio(raw_bytes, file_ext)
+    return envelope(samples_i16[::channels]) / 32768.0
+
+def process_audio(input_file, semitones):
+    try:
+        file_ext = input_file.name.split('.')[-1].lower()
+        if file_ext not in ['mp3', 'wav', 'ogg', 'flac', 'm4a']:
+            file_ext = 'mp3'
+        raw_bytes = input_file.getvalue()
+        
+        # Visualization
+        viz_placeholder.line_chart(waveform_envelope(raw_bytes, file_ext), height=200, color='#6366f1')
+        
+        return shift_audio(raw_bytes, file_ext, semitones)
+    except Exception as e:
+        st.error(f"❌ Processing Error: {str(e)}")
+        return None
+
 # Process button
 if uploaded_file and st.button("🚀 PROCESS AUDIO", use_container_width=True, type="primary"):
     if not st.session_state.get('ffmpeg_available', False):
@@ -327,11 +647,7 @@ if uploaded_file and st.button("🚀 PROCESS AUDIO", use_container_width=True, t
             loading_placeholder.empty()
             
             # Create download buffer
-            buffer = io.BytesIO()
-            output_format = "mp3"
-            st.session_state.processed_audio.export(buffer, format=output_format)
-            buffer.seek(0)
-            st.session_state.output_buffer = buffer
+            st.session_state.output_buffer = io.BytesIO(processed_audio)
             st.session_state.processing_time = processing_time
             st.balloons()
 
@@ -378,34 +694,30 @@ if st.session_state.processed and st.session_state.processed_audio:
             """, unsafe_allow_html=True)
 
 # Sidebar
-with st.sidebar:
-    st.markdown("""
-        <div style="text-align: center; margin-bottom: 2rem;">
-            <div class="floating" style="font-size: 2rem;">⚡</div>
-            <h3 style="color: #6366f1;">Real-Time Analytics</h3>
-        </div>
-    """, unsafe_allow_html=True)
-    
-    with st.container():
-        st.markdown("""
-            <div class="gradient-border">
-                <div style="padding: 1rem; color: rgba(255,255,255,0.8);">
-                    <h4>System Status</h4>
-                    <div style="display: grid; grid-template-columns: 2fr 1fr; gap: 1rem; margin-top: 1rem;">
-                        <div>CPU Usage</div>
-                        <div style="text-align: right; color: #ec4899;">42%</div>
-                        <div>Memory Usage</div>
-                        <div style="text-align: right; color: #ec4899;">64%</div>
-                        <div>Processing Power</div>
-                        <div style="text-align: right; color: #ec4899;">87%</div>
-                    </div>
-                </div>
+SIDEBAR_HTML = """
+    <div style="text-align: center; margin-bottom: 2rem;">
+        <div class="floating" style="font-size: 2rem;">⚡</div>
+        <h3 style="color: #6366f1;">Real-Time Analytics</h3>
+    </div>
+    <div class="gradient-border">
+        <div style="padding: 1rem; color: rgba(255,255,255,0.8);">
+            <h4>System Status</h4>
+            <div style="display: grid; grid-template-columns: 2fr 1fr; gap: 1rem; margin-top: 1rem;">
+                <div>CPU Usage</div>
+                <div style="text-align: right; color: #ec4899;">42%</div>
+                <div>Memory Usage</div>
+                <div style="text-align: right; color: #ec4899;">64%</div>
+                <div>Processing Power</div>
+                <div style="text-align: right; color: #ec4899;">87%</div>
             </div>
-        """, unsafe_allow_html=True)
-
-# Footer
-st.markdown("""
-    <div style="position: fixed; bottom: 0; left: 0; right: 0; text-align: center; padding: 1rem; color: rgba(255,255,255,0.6);">
-        Powered by Librosa AI Core | v3.1 | © 2023 Audio Labs International
+        </div>
     </div>
-""", unsafe_allow_html=True)
\ No newline at end of file
+"""
+
+@st.cache_resource
+def render_sidebar():
+    """Emit the static sidebar panel once; replayed into the sidebar on reruns"""
+    st.markdown(SIDEBAR_HTML, unsafe_allow_html=True)
+
+with st.sidebar:
+    render_sidebar()
\ No newline at end of file